@@ -1,4 +1,7 @@
-from flask import Flask, jsonify
+from datetime import datetime
+import orjson
+from flask import Flask, Response, jsonify, request
+from sqlalchemy import inspect, select
 from database.db import SessionLocal, Base, engine
 from database.models import Trend
 from services.scheduler import start_scheduler
@@ -6,6 +9,31 @@ from services.scheduler import start_scheduler
 # ✅ Create database tables automatically
 Base.metadata.create_all(bind=engine)
 
+# create_all() skips tables that already exist, so bring older databases
+# up to the current schema here. Databases that predate the score split
+# get the integer columns backfilled from the old Float score.
+columns = {c["name"] for c in inspect(engine).get_columns(Trend.__tablename__)}
+if "normalized_score" not in columns:
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ALTER TABLE trends ADD COLUMN normalized_score SMALLINT")
+        conn.exec_driver_sql("ALTER TABLE trends ADD COLUMN raw_score BIGINT")
+        conn.exec_driver_sql(
+            "UPDATE trends SET raw_score = CAST(ROUND(score) AS INTEGER), "
+            "normalized_score = MIN(100, CAST(ROUND(score) AS INTEGER))"
+        )
+
+# Databases that predate the uq_kw_src unique index carry duplicate rows —
+# collapse them to the newest per (keyword, source) before creating it.
+existing = {ix["name"] for ix in inspect(engine).get_indexes(Trend.__tablename__)}
+if "uq_kw_src" not in existing:
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "DELETE FROM trends WHERE id NOT IN "
+            "(SELECT MAX(id) FROM trends GROUP BY keyword, source)"
+        )
+for index in Trend.__table__.indexes:
+    index.create(bind=engine, checkfirst=True)
+
 app = Flask(__name__)
 start_scheduler()  # automatic background fetching
 
@@ -15,20 +43,35 @@ def home():
 
 @app.route("/api/trends")
 def get_trends():
-    db = SessionLocal()
-    trends = db.query(Trend).order_by(Trend.timestamp.desc()).limit(50).all()
+    query = (
+        select(Trend.keyword, Trend.source, Trend.normalized_score, Trend.timestamp)
+        .order_by(Trend.timestamp.desc())
+        .limit(50)
+    )
+
+    # keyset pagination: pass the oldest timestamp of the previous page
+    # to continue from there
+    before = request.args.get("before")
+    if before:
+        try:
+            query = query.where(Trend.timestamp < datetime.fromisoformat(before))
+        except ValueError:
+            return jsonify({"error": "before must be an ISO timestamp"}), 400
+
+    with SessionLocal() as db:
+        rows = db.execute(query).all()
 
     data = [
         {
-            "keyword": t.keyword,
-            "source": t.source,
-            "score": t.score,
-            "timestamp": t.timestamp.isoformat()
+            "keyword": r.keyword,
+            "source": r.source,
+            "score": r.normalized_score,
+            "timestamp": r.timestamp  # orjson serializes datetime directly
         }
-        for t in trends
+        for r in rows
     ]
 
-    return jsonify(data)
+    return Response(orjson.dumps(data, option=orjson.OPT_NAIVE_UTC), mimetype="application/json")
 
 if __name__ == "__main__":
     app.run(debug=True)
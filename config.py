@@ -8,9 +8,7 @@ DATABASE_URL = "sqlite:///trends.db"
 # YouTube API
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
-# Reddit API
-REDDIT_CLIENT_ID = "QxCygXhPhlw0ErkZeOceTw"  
-REDDIT_SECRET = "z6kF6tNjzHbMUIln4ZOuUJJfXsJezg"  
+# Reddit (public listing endpoints — no OAuth credentials needed)
 REDDIT_USER_AGENT = "education_scraper by u/Character_Vehicle553"
 
 
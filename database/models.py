@@ -1,12 +1,25 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime
 from datetime import datetime
+from sqlalchemy import BigInteger, Index, SmallInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
 from database.db import Base
 
 class Trend(Base):
     __tablename__ = "trends"
+    __table_args__ = (
+        # Covers the ORDER BY timestamp DESC hot path and filter-by-source queries
+        Index("ix_trends_ts_src", "timestamp", "source"),
+        # Recurring hot items upsert in place instead of growing the table;
+        # a unique index (not a table constraint) so startup can add it to
+        # databases created before it existed
+        Index("uq_kw_src", "keyword", "source", unique=True),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    keyword = Column(String, index=True)
-    source = Column(String)
-    score = Column(Float)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    keyword: Mapped[str] = mapped_column(String(200), index=True)
+    source: Mapped[str] = mapped_column(String(32), index=True)
+    # Sources report on wildly different scales (trends 0-100, reddit votes,
+    # view counts); the clamped 0-100 value is what /api/trends serves, the
+    # raw value is kept for debugging/rescoring
+    normalized_score: Mapped[int] = mapped_column(SmallInteger, index=True)
+    raw_score: Mapped[int] = mapped_column(BigInteger)
+    timestamp: Mapped[datetime] = mapped_column(index=True, default=datetime.utcnow)
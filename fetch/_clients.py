@@ -0,0 +1,12 @@
+"""
+Shared HTTP clients, kept alive across scheduler ticks so connections
+(and TLS handshakes) are reused instead of rebuilt every run.
+"""
+
+import httpx
+
+HTTPX = httpx.Client(
+    http2=True,
+    timeout=httpx.Timeout(10.0),
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+)
@@ -3,9 +3,16 @@ google_trends.py
 Fixed Google Trends scraper with proper rate limiting and caching
 """
 
+import re
 import time
 import random
-import requests
+import threading
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from cachetools import TTLCache
+from fetch._clients import HTTPX
+from fetch.ratelimit import TokenBucket
 from pytrends.request import TrendReq
 from datetime import datetime, timedelta
 import json
@@ -18,76 +25,87 @@ USER_AGENTS = [
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36"
 ]
 
-# Cache directory
+# Cache directory (cold-start copy of the in-process cache)
 CACHE_DIR = Path("cache")
 CACHE_DIR.mkdir(exist_ok=True)
 
-# Minimum time between requests (in seconds)
-MIN_REQUEST_INTERVAL = 60  # 1 minute between Google Trends requests
-LAST_REQUEST_FILE = CACHE_DIR / "last_google_request.txt"
+# In-process cache holding (results, cached_at) per key. The TTL matches the
+# 24h "older cache" fallback; per-call freshness is checked against cached_at
+# so hits cost no file I/O or JSON parsing.
+_cache = TTLCache(maxsize=64, ttl=24 * 3600)
+
+# Google Trends tolerates roughly one request per minute before 429s
+_bucket = TokenBucket(rate=1 / 60, capacity=1)
 
 
 def can_make_request():
-    """Check if enough time has passed since last request"""
-    if not LAST_REQUEST_FILE.exists():
-        return True
-    
-    try:
-        with open(LAST_REQUEST_FILE, 'r') as f:
-            last_request_time = float(f.read().strip())
-        
-        time_since_last = time.time() - last_request_time
-        
-        if time_since_last < MIN_REQUEST_INTERVAL:
-            wait_time = MIN_REQUEST_INTERVAL - time_since_last
-            print(f"⏳ Rate limit: Need to wait {wait_time:.0f} seconds before next request")
-            return False
-        
-        return True
-    except:
+    """Take a token from the rate limiter if one is available"""
+    if _bucket.take():
         return True
 
+    print(f"⏳ Rate limit: Need to wait {_bucket.eta():.0f} seconds before next request")
+    return False
 
-def record_request_time():
-    """Record the time of the current request"""
-    with open(LAST_REQUEST_FILE, 'w') as f:
-        f.write(str(time.time()))
 
+def _retry_after_seconds(exc):
+    """Seconds the server asked us to wait, if the error carried a 429 response"""
+    response = getattr(exc, 'response', None)
+    if response is None:
+        return None
 
-def get_cached_results(cache_key, max_age_hours=1):
-    """Get cached results if they exist and are fresh"""
+    try:
+        return int(response.headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
+
+
+def _load_from_disk(cache_key):
+    """Cold-start fallback: read the persisted copy of a cache entry"""
     cache_file = CACHE_DIR / f"{cache_key}.json"
-    
+
     if not cache_file.exists():
         return None
-    
+
     try:
         with open(cache_file, 'r') as f:
             cached_data = json.load(f)
-        
-        cache_time = datetime.fromisoformat(cached_data['timestamp'])
-        age = datetime.now() - cache_time
-        
-        if age.total_seconds() < max_age_hours * 3600:
-            print(f"✅ Using cached data (age: {age.total_seconds()/60:.1f} minutes)")
-            return cached_data['results']
-        
-        print(f"⚠️ Cache expired (age: {age.total_seconds()/3600:.1f} hours)")
-        return None
-    
+
+        return cached_data['results'], datetime.fromisoformat(cached_data['timestamp'])
+
     except Exception as e:
         print(f"⚠️ Cache read error: {e}")
         return None
 
 
-def save_to_cache(cache_key, results):
-    """Save results to cache"""
+def get_cached_results(cache_key, max_age_hours=1):
+    """Get cached results if they exist and are fresh"""
+    entry = _cache.get(cache_key)
+
+    if entry is None:
+        # Not in memory — maybe a previous run persisted it
+        entry = _load_from_disk(cache_key)
+        if entry is None:
+            return None
+        _cache[cache_key] = entry
+
+    results, cached_at = entry
+    age = datetime.now() - cached_at
+
+    if age.total_seconds() < max_age_hours * 3600:
+        print(f"✅ Using cached data (age: {age.total_seconds()/60:.1f} minutes)")
+        return results
+
+    print(f"⚠️ Cache expired (age: {age.total_seconds()/3600:.1f} hours)")
+    return None
+
+
+def _persist_to_disk(cache_key, results, cached_at):
     cache_file = CACHE_DIR / f"{cache_key}.json"
-    
+
     try:
         with open(cache_file, 'w') as f:
             json.dump({
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': cached_at.isoformat(),
                 'results': results
             }, f, indent=2)
         print(f"✅ Results cached to {cache_file}")
@@ -95,35 +113,58 @@ def save_to_cache(cache_key, results):
         print(f"⚠️ Cache save error: {e}")
 
 
+def save_to_cache(cache_key, results):
+    """Save results to the in-process cache, persisting to disk in the background"""
+    cached_at = datetime.now()
+    _cache[cache_key] = (results, cached_at)
+    threading.Thread(
+        target=_persist_to_disk, args=(cache_key, results, cached_at), daemon=True
+    ).start()
+
+
+SUGGEST_URL = "https://suggestqueries.google.com/complete/search"
+
+# Education-related keywords for filtering trending searches, compiled into
+# one alternation so each title is scanned in a single pass. The word
+# boundaries also stop short terms like 'cat' or 'gre' matching inside
+# unrelated words.
+EDU_KEYWORDS = [
+    'exam', 'result', 'admission', 'course', 'university',
+    'college', 'school', 'education', 'student', 'study',
+    'test', 'entrance', 'scholarship', 'degree', 'learning',
+    'jee', 'neet', 'upsc', 'gate', 'cat', 'gre', 'ielts'
+]
+EDU_RE = re.compile(r'\b(' + '|'.join(map(re.escape, EDU_KEYWORDS)) + r')\b', re.IGNORECASE)
+
+
+def _fetch_suggestions(seed):
+    """Fetch autocomplete suggestions for one seed term"""
+    r = HTTPX.get(SUGGEST_URL, params={"client": "firefox", "q": seed}, timeout=5)
+
+    if r.status_code == 200:
+        return r.json()[1][:2]
+    return []
+
+
 def fetch_dynamic_keywords():
-    """Fetch keywords from Google autocomplete with rate limiting"""
+    """Fetch keywords from Google autocomplete, fanning the seeds out concurrently"""
     seed_terms = [
-        "education", "exam", "online course", 
+        "education", "exam", "online course",
         "study tips", "scholarship"
     ]
-    
+
     all_keywords = set(seed_terms)
-    
-    for seed in seed_terms[:3]:  # Limit to 3 to avoid rate limits
-        try:
-            url = "https://suggestqueries.google.com/complete/search"
-            params = {
-                "client": "firefox",
-                "q": seed,
-            }
-            r = requests.get(url, params=params, timeout=5)
-            
-            if r.status_code == 200:
-                suggestions = r.json()[1]
-                all_keywords.update(suggestions[:2])
-            
-            # Rate limiting between autocomplete requests
-            time.sleep(random.uniform(1.0, 2.0))
-            
-        except Exception as e:
-            print(f"⚠️ Autocomplete failed for '{seed}': {e}")
-            continue
-    
+
+    # Limit to 3 seeds to avoid rate limits; the suggest endpoint tolerates
+    # them in parallel, so the latencies overlap instead of adding up
+    with ThreadPoolExecutor(max_workers=3) as ex:
+        futures = {ex.submit(_fetch_suggestions, s): s for s in seed_terms[:3]}
+        for future in as_completed(futures):
+            try:
+                all_keywords.update(future.result())
+            except Exception as e:
+                print(f"⚠️ Autocomplete failed for '{futures[future]}': {e}")
+
     keywords = list(all_keywords)[:10]
     print(f"✅ Auto keywords discovered: {keywords}")
     return keywords
@@ -143,14 +184,13 @@ def fetch_google_trends(geo="IN", timeframe="now 1-d", use_cache=True, cache_hou
         list: Trending keywords with scores
     """
     
+    # Cache hit must stay free: return before any keyword discovery or
+    # pytrends client construction happens
     cache_key = f"google_trends_{geo}_{timeframe}"
-    
-    # Try to use cache first
-    if use_cache:
-        cached = get_cached_results(cache_key, max_age_hours=cache_hours)
-        if cached:
-            return cached
-    
+
+    if use_cache and (cached := get_cached_results(cache_key, max_age_hours=cache_hours)):
+        return cached
+
     # Check rate limiting
     if not can_make_request():
         print("❌ Rate limit reached. Using fallback or cached data.")
@@ -160,30 +200,33 @@ def fetch_google_trends(geo="IN", timeframe="now 1-d", use_cache=True, cache_hou
             print("✅ Using older cached data (up to 24h old)")
             return cached
         return []
-    
+
     print("🔍 Fetching fresh data from Google Trends...")
-    
-    keywords = fetch_dynamic_keywords()
-    
-    # Fix for urllib3 compatibility issue
-    try:
-        pytrends = TrendReq(
-            hl="en-US",
-            tz=330,
-            timeout=(10, 30),
-            retries=2,
-            backoff_factor=0.5,
-            requests_args={"headers": {"User-Agent": random.choice(USER_AGENTS)}}
-        )
-    except TypeError:
-        # Fallback for older pytrends versions
-        pytrends = TrendReq(
-            hl="en-US",
-            tz=330,
-            requests_args={"headers": {"User-Agent": random.choice(USER_AGENTS)}}
-        )
-    
+
     try:
+        keywords = fetch_dynamic_keywords()
+
+        # The TrendReq constructor already talks to Google (cookie fetch), so
+        # it lives inside the try: a network failure here degrades to the
+        # cached-data path below instead of escaping into the scheduler
+        # Fix for urllib3 compatibility issue
+        try:
+            pytrends = TrendReq(
+                hl="en-US",
+                tz=330,
+                timeout=(10, 30),
+                retries=2,
+                backoff_factor=0.5,
+                requests_args={"headers": {"User-Agent": random.choice(USER_AGENTS)}}
+            )
+        except TypeError:
+            # Fallback for older pytrends versions
+            pytrends = TrendReq(
+                hl="en-US",
+                tz=330,
+                requests_args={"headers": {"User-Agent": random.choice(USER_AGENTS)}}
+            )
+
         # Build payload
         pytrends.build_payload(
             kw_list=keywords,
@@ -191,9 +234,6 @@ def fetch_google_trends(geo="IN", timeframe="now 1-d", use_cache=True, cache_hou
             geo=geo
         )
         
-        # Record that we're making a request
-        record_request_time()
-        
         # Try related_queries with exponential backoff
         data = None
         for attempt in range(3):
@@ -202,7 +242,8 @@ def fetch_google_trends(geo="IN", timeframe="now 1-d", use_cache=True, cache_hou
                 break
             except Exception as e:
                 if "429" in str(e):
-                    wait_time = (2 ** attempt) * 30  # 30s, 60s, 120s
+                    # Honor the server's Retry-After if it sent one
+                    wait_time = _retry_after_seconds(e) or (2 ** attempt) * 30  # 30s, 60s, 120s
                     print(f"⚠️ Rate limited (attempt {attempt+1}/3). Waiting {wait_time}s...")
                     time.sleep(wait_time)
                 else:
@@ -213,49 +254,42 @@ def fetch_google_trends(geo="IN", timeframe="now 1-d", use_cache=True, cache_hou
             print("❌ related_queries failed after retries — using fallback")
             return fallback_interest(pytrends, keywords, cache_key)
         
-        results = []
-        seen_keywords = set()
-        
-        # Process rising and top queries
+        # Collect rising and top queries; rising first so it wins the dedup
+        frames = []
         for key in data:
-            # Rising queries
-            rising = data[key].get("rising")
-            if rising is not None and not rising.empty:
-                for _, row in rising.iterrows():
-                    kw = row['query'].lower().strip()
-                    if kw not in seen_keywords:
-                        score = 100 if row['value'] == 'Breakout' else float(row['value'])
-                        results.append({
-                            "keyword": row['query'],
-                            "score": score,
-                            "type": "rising",
-                            "source": "google_trends",
-                            "timestamp": datetime.now().isoformat()
-                        })
-                        seen_keywords.add(kw)
-            
-            # Top queries
-            top = data[key].get("top")
-            if top is not None and not top.empty:
-                for _, row in top.iterrows():
-                    kw = row['query'].lower().strip()
-                    if kw not in seen_keywords:
-                        results.append({
-                            "keyword": row['query'],
-                            "score": float(row['value']),
-                            "type": "top",
-                            "source": "google_trends",
-                            "timestamp": datetime.now().isoformat()
-                        })
-                        seen_keywords.add(kw)
-        
+            for kind in ("rising", "top"):
+                df = data[key].get(kind)
+                if df is not None and not df.empty:
+                    frames.append(df.assign(type=kind))
+
+        if not frames:
+            print("⚠️ Empty results — using fallback")
+            return fallback_interest(pytrends, keywords, cache_key)
+
+        # Vectorized scoring/dedup: 'Breakout' maps to 100, everything else
+        # numeric; first occurrence of a normalized keyword wins
+        df = pd.concat(frames, ignore_index=True)
+        df["score"] = np.where(
+            df["value"].eq("Breakout"), 100.0, pd.to_numeric(df["value"], errors="coerce")
+        )
+        df["keyword_lc"] = df["query"].str.lower().str.strip()
+        df = df.dropna(subset=["score"]).drop_duplicates("keyword_lc")
+        now_iso = datetime.utcnow().isoformat()  # one capture for the whole batch
+        df = df.assign(
+            source="google_trends",
+            timestamp=now_iso
+        ).sort_values("score", ascending=False)
+
+        results = (
+            df[["query", "score", "type", "source", "timestamp"]]
+            .rename(columns={"query": "keyword"})
+            .to_dict("records")
+        )
+
         if len(results) == 0:
             print("⚠️ Empty results — using fallback")
             return fallback_interest(pytrends, keywords, cache_key)
         
-        # Sort by score
-        results.sort(key=lambda x: x['score'], reverse=True)
-        
         # Cache the results
         save_to_cache(cache_key, results)
         
@@ -287,19 +321,20 @@ def fallback_interest(pytrends, keywords, cache_key):
             return []
         
         last = df.iloc[-1]
-        results = []
-        
-        for kw in keywords:
-            score = float(last.get(kw, 0))
-            if score > 0:
-                results.append({
-                    "keyword": kw,
-                    "score": score,
-                    "type": "interest",
-                    "source": "google_trends_fallback",
-                    "timestamp": datetime.now().isoformat()
-                })
-        
+        now_iso = datetime.utcnow().isoformat()  # one capture for the whole batch
+
+        scores = {kw: float(last.get(kw, 0)) for kw in keywords}
+        results = [
+            {
+                "keyword": kw,
+                "score": score,
+                "type": "interest",
+                "source": "google_trends_fallback",
+                "timestamp": now_iso
+            }
+            for kw, score in scores.items() if score > 0
+        ]
+
         results.sort(key=lambda x: x['score'], reverse=True)
         
         # Cache fallback results too
@@ -316,13 +351,11 @@ def fallback_interest(pytrends, keywords, cache_key):
 def get_trending_topics(geo="IN"):
     """Get Google's current trending searches (lightweight, less rate limited)"""
     cache_key = f"trending_topics_{geo}"
-    
-    # Check cache first (30 min expiry for trending)
-    if True:  # Always use cache for trending to avoid rate limits
-        cached = get_cached_results(cache_key, max_age_hours=0.5)
-        if cached:
-            return cached
-    
+
+    # Check cache first (30 min expiry for trending), before building a client
+    if cached := get_cached_results(cache_key, max_age_hours=0.5):
+        return cached
+
     try:
         pytrends = TrendReq(
             hl="en-US",
@@ -331,27 +364,21 @@ def get_trending_topics(geo="IN"):
         )
         
         trending = pytrends.trending_searches(pn=geo.lower())
-        results = []
-        
-        # Education-related keywords
-        edu_keywords = [
-            'exam', 'result', 'admission', 'course', 'university', 
-            'college', 'school', 'education', 'student', 'study',
-            'test', 'entrance', 'scholarship', 'degree', 'learning',
-            'jee', 'neet', 'upsc', 'gate', 'cat', 'gre', 'ielts'
+        now_iso = datetime.utcnow().isoformat()  # one capture for the whole batch
+
+        # Filter for education-related terms
+        results = [
+            {
+                "keyword": keyword,
+                "score": 100 - idx,
+                "type": "trending",
+                "source": "google_trending",
+                "timestamp": now_iso
+            }
+            for idx, keyword in enumerate(trending[0])
+            if EDU_RE.search(keyword)
         ]
         
-        for idx, keyword in enumerate(trending[0]):
-            # Filter for education-related terms
-            if any(term in keyword.lower() for term in edu_keywords):
-                results.append({
-                    "keyword": keyword,
-                    "score": 100 - idx,
-                    "type": "trending",
-                    "source": "google_trending",
-                    "timestamp": datetime.now().isoformat()
-                })
-        
         # Cache the results
         save_to_cache(cache_key, results)
         
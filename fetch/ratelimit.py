@@ -0,0 +1,31 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """Token-bucket rate limiter: bursts up to `capacity`, refills at `rate` tokens/sec."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        """Consume one token if available. Returns True on success."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def eta(self):
+        """Seconds until the next token becomes available."""
+        with self._lock:
+            if self.tokens >= 1:
+                return 0.0
+            return (1 - self.tokens) / self.rate
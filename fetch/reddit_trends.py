@@ -1,7 +1,9 @@
-import praw
-import time
-import random
-from config import REDDIT_CLIENT_ID, REDDIT_SECRET, REDDIT_USER_AGENT
+import asyncio
+import itertools
+import aiohttp
+from cachetools import TTLCache
+from config import REDDIT_USER_AGENT
+from fetch.ratelimit import TokenBucket
 
 SUBREDDITS = [
     "education", "Teachers", "teaching", "EdTech", "HigherEducation", "academia",
@@ -16,35 +18,89 @@ SUBREDDITS = [
     "study", "studyhack", "GetStudying", "productivity", "research"
 ]
 
-def fetch_reddit_trends():
-    try:
-        reddit = praw.Reddit(
-            client_id=REDDIT_CLIENT_ID,
-            client_secret=REDDIT_SECRET,
-            user_agent=REDDIT_USER_AGENT
+# raw_json=1 stops Reddit HTML-escaping titles in the payload
+HOT_URL = "https://www.reddit.com/r/{name}/hot.json?limit=8&raw_json=1"
+
+# Reddit allows ~60 unauthenticated requests per minute; let small bursts
+# through but keep the average rate under the limit.
+_bucket = TokenBucket(rate=1.0, capacity=8)
+
+# Each tick only refreshes one of SHARDS round-robin slices (~9 subreddits)
+# instead of all 54, keeping per-tick work bounded. Results from earlier
+# shards are merged in from this cache, so callers still see full coverage;
+# the TTL comfortably outlives a full rotation at the 5-minute tick rate.
+SHARDS = 6
+_tick = itertools.count()
+_sub_cache = TTLCache(maxsize=len(SUBREDDITS), ttl=60 * 60)
+
+# Event loop and client session persisted across scheduler ticks, so the
+# connection pool (and its TLS handshakes) survives between runs. Ticks
+# never overlap (max_instances=1), so sharing one loop is safe.
+_loop = None
+_session = None
+
+
+def _get_loop():
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop
+
+
+async def _get_session():
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            headers={"User-Agent": REDDIT_USER_AGENT},
+            connector=aiohttp.TCPConnector(limit=16, keepalive_timeout=60),
         )
+    return _session
+
+
+async def _fetch_one(session, sem, name):
+    async with sem:
+        while not _bucket.take():
+            await asyncio.sleep(_bucket.eta())
+
+        try:
+            async with session.get(HOT_URL.format(name=name)) as resp:
+                data = await resp.json()
 
-        reddit.read_only = True
-        results = []
+            results = []
+            for child in data["data"]["children"]:
+                post = child["data"]
+                results.append({
+                    "keyword": post["title"],
+                    "score": int(post.get("score") or 0),
+                    "source": "reddit"
+                })
+            return results
 
-        for name in SUBREDDITS:
-            try:
-                sub = reddit.subreddit(name)
+        except Exception as e:
+            print(f"⚠️ Skipping subreddit {name}: {e}")
+            return []
 
-                for post in sub.hot(limit=8):
-                    results.append({
-                        "keyword": post.title,
-                        "score": int(post.score) if post.score else 0,
-                        "source": "reddit"
-                    })
 
-                # random sleep to avoid rate limits
-                time.sleep(random.uniform(0.2, 0.6))
+async def _fetch_all(names):
+    sem = asyncio.Semaphore(8)
+    session = await _get_session()
+    return await asyncio.gather(*[_fetch_one(session, sem, n) for n in names])
+
+
+def fetch_reddit_trends():
+    try:
+        shard = SUBREDDITS[next(_tick) % SHARDS::SHARDS]
+        batches = _get_loop().run_until_complete(_fetch_all(shard))
 
-            except Exception as e:
-                print(f"⚠️ Skipping subreddit {name}: {e}")
+        # Keep the freshest good batch per subreddit; failed fetches keep
+        # serving their cached entry until the TTL expires
+        for name, items in zip(shard, batches):
+            if items:
+                _sub_cache[name] = items
 
-        print(f"✅ Reddit trends fetched: {len(results)} items")
+        results = [item for items in _sub_cache.values() for item in items]
+        print(f"✅ Reddit trends fetched: {len(results)} items "
+              f"({len(shard)} subreddits refreshed)")
         return results
 
     except Exception as e:
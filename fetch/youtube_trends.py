@@ -4,18 +4,21 @@ from config import YOUTUBE_API_KEY
 def fetch_youtube_trends():
     youtube = build("youtube", "v3", developerKey=YOUTUBE_API_KEY)
 
+    # Partial response: only the two fields we read, and the API max of 50
+    # results in a single call instead of paginating
     req = youtube.videos().list(
         part="snippet,statistics",
         chart="mostPopular",
         regionCode="IN",
-        maxResults=20
+        maxResults=50,
+        fields="items(snippet/title,statistics/viewCount)"
     )
     response = req.execute()
 
     results = []
     for item in response["items"]:
         title = item["snippet"]["title"]
-        score = float(item["statistics"].get("viewCount", 0))
+        score = int(item["statistics"].get("viewCount", 0))
 
         results.append({
             "keyword": title,
@@ -24,4 +27,3 @@ def fetch_youtube_trends():
         })
 
     return results
-
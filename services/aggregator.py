@@ -1,15 +1,41 @@
+from datetime import datetime
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from database.db import SessionLocal
 from database.models import Trend
 
+def _row(t, now):
+    raw = int(round(float(t["score"])))
+    return {
+        "keyword": t["keyword"],
+        "source": t["source"],
+        "normalized_score": min(100, raw),
+        "raw_score": raw,
+        "timestamp": now
+    }
+
 def save_trends(trend_list):
-    db = SessionLocal()
-    for t in trend_list:
-        entry = Trend(
-            keyword=t["keyword"],
-            source=t["source"],
-            score=t["score"]
-        )
-        db.add(entry)
-    db.commit()
-    db.close()
+    if not trend_list:
+        return
+
+    # Core bulk insert bypasses Python-side column defaults, so stamp
+    # the timestamp explicitly. Dedupe within the batch so the upsert
+    # never touches the same (keyword, source) row twice in one statement.
+    now = datetime.utcnow()
+    rows = list({
+        (t["keyword"], t["source"]): _row(t, now)
+        for t in trend_list
+    }.values())
+
+    stmt = sqlite_insert(Trend).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["keyword", "source"],
+        set_={
+            "normalized_score": stmt.excluded.normalized_score,
+            "raw_score": stmt.excluded.raw_score,
+            "timestamp": stmt.excluded.timestamp,
+        },
+    )
 
+    with SessionLocal() as db:
+        db.execute(stmt)
+        db.commit()
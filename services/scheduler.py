@@ -1,32 +1,71 @@
+import queue
+import threading
 from apscheduler.schedulers.background import BackgroundScheduler
 from fetch.google_trends import fetch_google_trends
 from fetch.reddit_trends import fetch_reddit_trends
 # from fetch.youtube_trends import fetch_youtube_trends   # Disabled for now
-from database.db import SessionLocal
-from database.models import Trend
-
-def save_to_db(items):
-    db = SessionLocal()
-    for item in items:
-        trend = Trend(
-            keyword=item["keyword"],
-            source=item["source"],
-            score=item["score"]
-        )
-        db.add(trend)
-    db.commit()
-    db.close()
+from services.aggregator import save_trends
+
+# Fingerprint of the last batch saved per source, so a tick that fetched
+# the same keywords again (e.g. everything came from cache) skips the write
+_last_batch = {}
+
+# Write-behind queue: ticks enqueue batches and a single worker thread does
+# the inserts, so fetchers never block on a DB commit
+WRITE_Q = queue.Queue(maxsize=32)
+_writer_started = threading.Event()
+
+def _is_new_batch(source, items):
+    digest = hash(frozenset(item["keyword"] for item in items))
+    if _last_batch.get(source) == digest:
+        return False
+    _last_batch[source] = digest
+    return True
+
+def _writer_loop():
+    while True:
+        batches = [WRITE_Q.get()]
+        # Drain whatever else is already queued into the same insert
+        while len(batches) < 64 and not WRITE_Q.empty():
+            batches.append(WRITE_Q.get_nowait())
+
+        items = [item for batch in batches for item in batch]
+        try:
+            save_trends(items)
+        except Exception as e:
+            print("❌ DB writer error:", e)
+        finally:
+            for _ in batches:
+                WRITE_Q.task_done()
+
+def _start_writer():
+    if not _writer_started.is_set():
+        _writer_started.set()
+        threading.Thread(target=_writer_loop, daemon=True).start()
 
 def scheduled_job():
     print("✅ Scheduler running…")
 
-    google = fetch_google_trends()
-    reddit = fetch_reddit_trends()
+    batches = {
+        "google": fetch_google_trends(),
+        "reddit": fetch_reddit_trends(),
+    }
 
-    save_to_db(google)
-    save_to_db(reddit)
+    for source, items in batches.items():
+        if items and _is_new_batch(source, items):
+            WRITE_Q.put(items)
+        else:
+            print(f"⏭️ {source}: nothing new to save")
 
 def start_scheduler():
+    _start_writer()
     scheduler = BackgroundScheduler()
-    scheduler.add_job(scheduled_job, "interval", seconds=30)
+    scheduler.add_job(
+        scheduled_job,
+        "interval",
+        minutes=5,
+        jitter=30,
+        max_instances=1,
+        coalesce=True,
+    )
     scheduler.start()